@@ -1,7 +1,13 @@
 #!/usr/bin/env python3
 import argparse
 from openpyxl import load_workbook
-from datetime import datetime, timedelta
+try:
+    from python_calamine import CalamineWorkbook  # optional, much faster xlsx reader
+except ImportError:
+    CalamineWorkbook = None
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from operator import itemgetter
 import hashlib
 import os, sys
 
@@ -26,21 +32,48 @@ END:DAYLIGHT
 END:VTIMEZONE
 """
 
+VCAL_PROLOGUE = (
+    "BEGIN:VCALENDAR\n"
+    "PRODID:-//YourUni//Class Feeds 1.0//EN\n"
+    "VERSION:2.0\n"
+    "CALSCALE:GREGORIAN\n"
+    "METHOD:PUBLISH\n"
+    + AUS_TZ_VTIMEZONE.strip() + "\n"
+).encode()
+
+TRANSP_T = b"TRANSP:TRANSPARENT\n"
+TRANSP_O = b"TRANSP:OPAQUE\n"
+
 def fmt_local(dt: datetime) -> str:
     return dt.strftime("%Y%m%dT%H%M%S")
 
 def fmt_date(d: datetime) -> str:
     return d.strftime("%Y%m%d")
 
+# Weekly timetables repeat the same few dates and times across many rows
+@lru_cache(maxsize=4096)
 def parse_date(s):
     if not s:
         return None
-    return datetime.strptime(str(s).strip(), "%Y-%m-%d")
-
+    if isinstance(s, date):
+        # Native cell value (datetime is a date subclass); drop any time part
+        return datetime(s.year, s.month, s.day)
+    s = str(s).strip()
+    # Fast path for the canonical YYYY-MM-DD; anything looser goes to strptime
+    if len(s) == 10 and s[4] == "-" and s[7] == "-" and s[:4].isdigit() and s[5:7].isdigit() and s[8:].isdigit():
+        return datetime(int(s[0:4]), int(s[5:7]), int(s[8:10]))
+    return datetime.strptime(s, "%Y-%m-%d")
+
+@lru_cache(maxsize=4096)
 def parse_time(s):
     if not s:
         return None
-    return datetime.strptime(str(s).strip(), "%H:%M")
+    if isinstance(s, (time, datetime)):
+        return datetime(1900, 1, 1, s.hour, s.minute)
+    s = str(s).strip()
+    if len(s) == 5 and s[2] == ":" and s[:2].isdigit() and s[3:].isdigit():
+        return datetime(1900, 1, 1, int(s[0:2]), int(s[3:5]))
+    return datetime.strptime(s, "%H:%M")
 
 def parse_datetime(date_str, time_str):
     d = parse_date(date_str)
@@ -51,82 +84,116 @@ def parse_datetime(date_str, time_str):
     t = parse_time(time_str)
     return datetime(d.year, d.month, d.day, t.hour, t.minute, 0)
 
-def truthy(val) -> bool:
-    if val is None:
-        return False
-    s = str(val).strip().lower()
-    return s in {"true", "yes", "y", "1", "transparent", "free"}
+def date_text(v) -> str:
+    """Text form of a date cell value, as if it had been typed in."""
+    if isinstance(v, date):
+        return v.strftime("%Y-%m-%d")
+    return v
 
-def make_uid(fields):
-    h = hashlib.sha1("|".join(fields).encode("utf-8")).hexdigest()[:16]
-    return f"{h}@youruni"
+def time_text(v) -> str:
+    """Text form of a time cell value; a datetime here keeps its time of day."""
+    if isinstance(v, (time, datetime)):
+        return v.strftime("%H:%M")
+    return v
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--xlsx", required=True)
-    ap.add_argument("--sheet", default=None)  # auto-detect first sheet if not given
-    ap.add_argument("--out", default="calendar.ics")
-    args = ap.parse_args()
+_TRUTHY = frozenset({"true", "yes", "y", "1", "transparent", "free"})
+_truthy_cache = {}  # text cells repeat a handful of values
 
-    wb = load_workbook(args.xlsx, data_only=True)
-    sheet_name = args.sheet or wb.sheetnames[0]
-    ws = wb[sheet_name]
-
-    # Map headers exactly
-    hdr_cells = next(ws.iter_rows(min_row=1, max_row=1, values_only=True))
-    headers = [ (h or "").strip() for h in hdr_cells ]
-    header_map = { h: i for i, h in enumerate(headers) }
-
-    def col(name):
-        return header_map.get(name, -1)
-
-    col_UID = col("Unique ID")
-    col_Course = col("Course Code")
-    col_Title = col("Title")
-    col_Cat = col("Category")
-    col_SDate = col("Start Date")
-    col_STime = col("Start Time")
-    col_EDate = col("End Date")
-    col_ETime = col("End Time")
-    col_TZ = col("Timezone")
-    col_Loc = col("Location")
-    col_Desc = col("Description")
-    col_URL = col("Link")
-    col_TRANSP = col("TRANSPARENT")
-
-    now_utc = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
-
-    lines = [
-        "BEGIN:VCALENDAR",
-        "PRODID:-//YourUni//Class Feeds 1.0//EN",
-        "VERSION:2.0",
-        "CALSCALE:GREGORIAN",
-        "METHOD:PUBLISH",
-        AUS_TZ_VTIMEZONE.strip()
-    ]
+def truthy(val) -> bool:
+    if val is None:
+        return False
+    if type(val) is bool:
+        return val
+    # 1, 1.0 and True compare equal, so non-text values are keyed by type too
+    key = val if type(val) is str else (type(val), val)
+    r = _truthy_cache.get(key)
+    if r is None:
+        r = _truthy_cache[key] = str(val).strip().lower() in _TRUTHY
+    return r
 
-    event_count = 0
+_uid_cache = {}
 
-    for r in ws.iter_rows(min_row=2, values_only=True):
-        if r is None or all(v in (None, "") for v in r):
+def make_uid(fields):
+    key = tuple(fields)
+    uid = _uid_cache.get(key)
+    if uid is None:
+        h = hashlib.blake2b("|".join(fields).encode("utf-8"), digest_size=8).hexdigest()
+        uid = _uid_cache[key] = f"{h}@youruni"
+    return uid
+
+def read_rows(path, sheet=None):
+    """Yield the sheet's rows as tuples of plain cell values, header row first."""
+    if CalamineWorkbook is not None:
+        wb = CalamineWorkbook.from_path(path)
+        try:
+            ws = wb.get_sheet_by_name(sheet or wb.sheet_names[0])
+            for row in ws.iter_rows():
+                # calamine reports every number as float; openpyxl keeps whole numbers as int
+                yield tuple(int(v) if type(v) is float and v.is_integer() else v for v in row)
+        finally:
+            wb.close()
+        return
+
+    wb = load_workbook(path, data_only=True, read_only=True)
+    try:
+        ws = wb[sheet or wb.sheetnames[0]]
+        try:
+            ws.calculate_dimension()
+        except ValueError:
+            # Unsized sheet: let the stream decide where rows end
+            ws.reset_dimensions()
+        yield from ws.iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+def format_rows(rows, cols, width, dtstamp_line, emit):
+    """Write a VEVENT for each usable row through emit(); return how many were written."""
+    (col_UID, col_Course, col_Title, col_Cat, col_SDate, col_STime,
+     col_EDate, col_ETime, col_TZ, col_Loc, col_Desc, col_URL, col_TRANSP) = cols
+    if all(c >= 0 for c in cols):
+        # Usual case: every column is there, so one C-level call slices the row
+        pick = itemgetter(*cols)
+    else:
+        # Absent columns read a None slot appended just past the header width
+        getter = itemgetter(*(c if c >= 0 else width for c in cols))
+        def pick(r):
+            return getter(r[:width] + (None,))
+
+    # Rows without a Title or Start Date never become events
+    required = [i for i in (col_Title, col_SDate) if i >= 0]
+    native = (date, time)
+    count = 0
+
+    for r in rows:
+        if not r:
+            # None, or the [] openpyxl yields for a missing row of an unsized sheet
+            continue
+        if len(r) < width:
+            # streamed rows can stop at the last stored cell
+            r = tuple(r) + (None,) * (width - len(r))
+        if not any(r[i] for i in required):
             continue
 
-        title = (r[col_Title] or "").strip() if col_Title >= 0 and r[col_Title] else ""
+        (uid, course, title, cat, sdate, stime, edate, etime,
+         tz, location, desc, url, transp) = pick(r)
+
+        title = str(title).strip() if title else ""
         if not title:
             continue
 
-        uid = (r[col_UID] or "").strip() if col_UID >= 0 and r[col_UID] else ""
-        course = (r[col_Course] or "").strip() if col_Course >= 0 and r[col_Course] else ""
-        cat = (r[col_Cat] or "").strip() if col_Cat >= 0 and r[col_Cat] else ""
-        sdate = (r[col_SDate] or "").strip() if col_SDate >= 0 and r[col_SDate] else ""
-        stime = (r[col_STime] or "").strip() if col_STime >= 0 and r[col_STime] else ""
-        edate = (r[col_EDate] or "").strip() if col_EDate >= 0 and r[col_EDate] else ""
-        etime = (r[col_ETime] or "").strip() if col_ETime >= 0 and r[col_ETime] else ""
-        tz = (r[col_TZ] or "").strip() if col_TZ >= 0 and r[col_TZ] else DEFAULT_TZ
-        location = (r[col_Loc] or "").strip() if col_Loc >= 0 and r[col_Loc] else ""
-        desc = (r[col_Desc] or "").strip() if col_Desc >= 0 and r[col_Desc] else ""
-        url = (r[col_URL] or "").strip() if col_URL >= 0 and r[col_URL] else ""
-        is_transparent = truthy(r[col_TRANSP]) if col_TRANSP >= 0 else False
+        uid = str(uid).strip() if uid else ""
+        course = str(course).strip() if course else ""
+        cat = str(cat).strip() if cat else ""
+        # Date/time columns keep native values when Excel stores real dates/times
+        sdate = (sdate if isinstance(sdate, native) else str(sdate).strip()) if sdate else ""
+        stime = (stime if isinstance(stime, native) else str(stime).strip()) if stime else ""
+        edate = (edate if isinstance(edate, native) else str(edate).strip()) if edate else ""
+        etime = (etime if isinstance(etime, native) else str(etime).strip()) if etime else ""
+        tz = str(tz).strip() if tz else DEFAULT_TZ
+        location = str(location).strip() if location else ""
+        desc = str(desc).strip() if desc else ""
+        url = str(url).strip() if url else ""
+        is_transparent = truthy(transp)
 
         if not sdate:
             continue
@@ -134,42 +201,55 @@ def main():
         is_all_day = (not stime and not etime)
 
         if not uid:
-            base_fields = [course, title, sdate, edate or "", stime or "", etime or "", location]
+            base_fields = [course, title, date_text(sdate), date_text(edate), time_text(stime), time_text(etime), location]
             uid = make_uid(base_fields)
 
         summary = f"{course} — {title}" if course else title
 
-        lines.append("BEGIN:VEVENT")
-        lines.append(f"UID:{uid}")
-        lines.append(f"DTSTAMP:{now_utc}")
-        lines.append(f"SUMMARY:{summary}")
+        # Bytes templates plus in-place bytearray growth: no per-line str objects
+        out = bytearray(b"BEGIN:VEVENT\nUID:")
+        out += uid.encode()
+        out += b"\n"
+        out += dtstamp_line
+        out += b"SUMMARY:"
+        out += summary.encode()
+        out += b"\n"
         if location:
-            lines.append(f"LOCATION:{location}")
+            out += b"LOCATION:"
+            out += location.encode()
+            out += b"\n"
         if desc:
-            lines.append("DESCRIPTION:" + desc.replace("\\n", "\\n"))
+            out += b"DESCRIPTION:"
+            out += desc.replace("\\n", "\\n").encode()
+            out += b"\n"
         if url:
-            lines.append(f"URL:{url}")
+            out += b"URL:"
+            out += url.encode()
+            out += b"\n"
 
         cats = []
         if course: cats.append(course)
         if cat: cats.append(cat)
         if location: cats.append(location)
         if cats:
-            lines.append(f"CATEGORIES:{','.join(cats)}")
+            out += b"CATEGORIES:"
+            out += ",".join(cats).encode()
+            out += b"\n"
 
-        lines.append(f"TRANSP:{'TRANSPARENT' if is_transparent else 'OPAQUE'}")
+        out += TRANSP_T if is_transparent else TRANSP_O
 
+        # One write per event; unparseable dates still close the VEVENT
         if is_all_day:
             start_d = parse_date(sdate)
             if not start_d:
-                lines.append("END:VEVENT")
+                out += b"END:VEVENT\n"
+                emit(out)
                 continue
             if edate:
                 end_d_exclusive = parse_date(edate) + timedelta(days=1)
             else:
                 end_d_exclusive = start_d + timedelta(days=1)
-            lines.append(f"DTSTART;VALUE=DATE:{fmt_date(start_d)}")
-            lines.append(f"DTEND;VALUE=DATE:{fmt_date(end_d_exclusive)}")
+            out += f"DTSTART;VALUE=DATE:{fmt_date(start_d)}\nDTEND;VALUE=DATE:{fmt_date(end_d_exclusive)}\n".encode()
         else:
             dt_start = parse_datetime(sdate, stime or "00:00")
             if edate:
@@ -177,18 +257,66 @@ def main():
             else:
                 dt_end = parse_datetime(sdate, etime or "00:00")
             if not dt_start or not dt_end:
-                lines.append("END:VEVENT")
+                out += b"END:VEVENT\n"
+                emit(out)
                 continue
-            lines.append(f"DTSTART;TZID={tz}:{fmt_local(dt_start)}")
-            lines.append(f"DTEND;TZID={tz}:{fmt_local(dt_end)}")
+            out += f"DTSTART;TZID={tz}:{fmt_local(dt_start)}\nDTEND;TZID={tz}:{fmt_local(dt_end)}\n".encode()
+
+        out += b"END:VEVENT\n"
+        emit(out)
+        count += 1
+
+    return count
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--xlsx", required=True)
+    ap.add_argument("--sheet", default=None)  # auto-detect first sheet if not given
+    ap.add_argument("--out", default="calendar.ics")
+    args = ap.parse_args()
+
+    rows = read_rows(args.xlsx, args.sheet)
+
+    # Map headers exactly
+    hdr = next(rows, ())
+    headers = [ (h or "").strip() for h in hdr ]
+    header_map = { h: i for i, h in enumerate(headers) }
+    width = len(headers)
+
+    def col(name):
+        return header_map.get(name, -1)
+
+    col_UID = col("Unique ID")
+    col_Course = col("Course Code")
+    col_Title = col("Title")
+    col_Cat = col("Category")
+    col_SDate = col("Start Date")
+    col_STime = col("Start Time")
+    col_EDate = col("End Date")
+    col_ETime = col("End Time")
+    col_TZ = col("Timezone")
+    col_Loc = col("Location")
+    col_Desc = col("Description")
+    col_URL = col("Link")
+    col_TRANSP = col("TRANSPARENT")
+
+    cols = (col_UID, col_Course, col_Title, col_Cat, col_SDate, col_STime,
+            col_EDate, col_ETime, col_TZ, col_Loc, col_Desc, col_URL, col_TRANSP)
+
+    # Same stamp on every event, so format the whole line once
+    DTSTAMP_LINE = datetime.now(timezone.utc).strftime("DTSTAMP:%Y%m%dT%H%M%SZ\n").encode()
+
+    out_dir = os.path.dirname(args.out)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
 
-        lines.append("END:VEVENT")
-        event_count += 1
+    with open(args.out, "wb") as f:
+        emit = f.write
+        emit(VCAL_PROLOGUE)
 
-    lines.append("END:VCALENDAR")
+        event_count = format_rows(rows, cols, width, DTSTAMP_LINE, emit)
 
-    with open(args.out, "w", encoding="utf-8", newline="\n") as f:
-        f.write("\n".join(lines))
+        emit(b"END:VCALENDAR\n")
 
     print(f"Wrote {args.out} with {event_count} events")
 